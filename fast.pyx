@@ -0,0 +1,31 @@
+# cython: language_level=3, boundscheck=False, wraparound=False
+"""
+Compiled version of model._build_vec, the per-request feature-row fill.
+Build it next to model.py with:  python setup.py build_ext --inplace
+"""
+
+
+cpdef void build_vec(float[::1] row,
+                     Py_ssize_t year_i, Py_ssize_t present_i, Py_ssize_t kms_i,
+                     double year, double present_price, double kms_driven,
+                     Py_ssize_t fuel_i, Py_ssize_t seller_i, Py_ssize_t trans_i,
+                     Py_ssize_t owner_i, Py_ssize_t name_i) noexcept nogil:
+    cdef Py_ssize_t i
+    for i in range(row.shape[0]):
+        row[i] = 0.0
+
+    row[year_i] = <float>year
+    row[present_i] = <float>present_price
+    row[kms_i] = <float>kms_driven
+
+    # -1 means the category has no training column (drop_first base / unseen name)
+    if fuel_i >= 0:
+        row[fuel_i] = 1.0
+    if seller_i >= 0:
+        row[seller_i] = 1.0
+    if trans_i >= 0:
+        row[trans_i] = 1.0
+    if owner_i >= 0:
+        row[owner_i] = 1.0
+    if name_i >= 0:
+        row[name_i] = 1.0
@@ -1,30 +1,162 @@
-from fastapi import FastAPI
-from fastapi.responses import JSONResponse
-from schema import Car_Features, PredictionResponse
-from model import load_artifacts,predict_price
+import multiprocessing
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import asynccontextmanager
+from functools import lru_cache
+import anyio
+from fastapi import FastAPI, HTTPException, Request, Response
+from fastapi.exceptions import RequestValidationError
+import msgspec
+from schema import CAR_DECODER, BatchPredictionResponse, CarBatch, PredictionResponse
+from model import load_artifacts,predict_from_fields,predict_many
 from fastapi.middleware.cors import CORSMiddleware
 
-app = FastAPI()
+_pool = None  # inference processes, one per core, alive for the app's lifespan
+
+
+def _usable_cpus() -> int:
+    # cpu_count() ignores container/affinity limits; sched_getaffinity() is Linux-only
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    global _pool
+    # warm this process for the in-process fallback in _infer()
+    load_artifacts()
+    # One single-threaded predictor per usable core. Workers are spawned
+    # (the pool starts them from anyio worker threads, where fork is unsafe)
+    # and each loads its own copy of the model in the initializer.
+    _pool = ProcessPoolExecutor(
+        max_workers=_usable_cpus(),
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=load_artifacts,
+        initargs=(1,),
+    )
+    yield
+    _pool.shutdown()
+    _pool = None
+
+
+app = FastAPI(lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["*"],  # later you can restrict to your streamlit domain
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+    allow_origins=["http://localhost:8501", "http://127.0.0.1:8501"],  # local streamlit
+    allow_origin_regex=r"https://.*\.streamlit\.app",
+    allow_methods=["GET", "POST"],
+    allow_headers=["content-type"],
 )
 
-@app.on_event("startup")
-def startup_event():
-    load_artifacts()
+
+# Pre-serialized once. A fresh Response per call is still needed: middleware
+# (CORS) edits the outgoing header list, so one shared instance would leak
+# headers between requests.
+_HEALTH_BODY = b'{"message":"this is test route"}'
 
 
 @app.get("/")
-def test():
-    return JSONResponse(status_code=200, content={"message": "this is test route"})
+async def test():
+    return Response(content=_HEALTH_BODY, media_type="application/json")
+
+
+def _infer(fn, *args):
+    if _pool is None:  # app used without its lifespan (scripts, bare TestClient)
+        return fn(*args)
+    # sklearn holds the GIL for much of predict(), so run it in another process
+    return _pool.submit(fn, *args).result()
+
+
+# A valid Car_Features body is a few hundred bytes; anything past this is
+# rejected before it can become a key in the cache below.
+MAX_BODY_BYTES = 2048
+
+
+@lru_cache(maxsize=10_000)
+def _cached_prediction(body: bytes) -> float:
+    """
+    Repeat requests with a byte-identical body skip both validation and
+    inference. Invalid bodies raise, so they are never cached.
+    """
+    # raw bytes -> validated struct in one msgspec pass, no intermediate dict
+    features = CAR_DECODER.decode(body)
+    args = (
+        features.Car_Name, features.Year, features.Present_Price, features.Kms_Driven,
+        features.Fuel_Type, features.Seller_Type, features.Transmission, features.Owner,
+    )
+    return _infer(predict_from_fields, *args)
+
+
+# msgspec reports where a value failed as "... - at `$.Year`" (or
+# "`$.items[0].Year`"), and a missing key as "... field `Year`".
+_MSGSPEC_PATH = re.compile(r" - at `\$(?P<path>[^`]*)`$")
+_MSGSPEC_STEP = re.compile(r"\.(\w+)|\[(\d+)\]")
+_MSGSPEC_MISSING = re.compile(r"missing required field `(\w+)`")
+
+
+def _validation_error(exc: msgspec.DecodeError) -> dict:
+    """Shapes a msgspec error like FastAPI's own 422 entries, per-field loc included."""
+    msg = str(exc)
+    loc = ["body"]
+    error_type = "value_error"
+    if isinstance(exc, msgspec.ValidationError):
+        path = _MSGSPEC_PATH.search(msg)
+        if path:
+            for key, index in _MSGSPEC_STEP.findall(path["path"]):
+                loc.append(key or int(index))
+        missing = _MSGSPEC_MISSING.search(msg)
+        if missing:
+            loc.append(missing[1])
+            error_type = "missing"
+    return {"type": error_type, "loc": tuple(loc), "msg": msg}
+
+
+# Car_Features reaches components.schemas through CarBatch on /predict_batch;
+# /predict parses its body by hand, so it only needs to point at it.
+@app.post(
+    "/predict",
+    response_model=PredictionResponse,
+    openapi_extra={"requestBody": {
+        "required": True,
+        "content": {"application/json": {"schema": {"$ref": "#/components/schemas/Car_Features"}}},
+    }},
+)
+async def predict(request: Request):
+    body = await request.body()
+    if len(body) > MAX_BODY_BYTES:
+        raise HTTPException(status_code=413, detail="Request body too large")
+
+    # the cache lookup / pool wait runs in a thread, keeping the event loop free
+    try:
+        price = await anyio.to_thread.run_sync(_cached_prediction, body)
+    except msgspec.DecodeError as exc:  # also covers msgspec.ValidationError
+        raise RequestValidationError([_validation_error(exc)])
+
+    # with a response_model and the default response class, FastAPI dumps
+    # straight to JSON bytes through pydantic-core
+    return {"prediction_price": price}
+
+
+@app.post("/predict_batch", response_model=BatchPredictionResponse)
+async def predict_batch(batch: CarBatch):
+    rows = [
+        (f.Car_Name, f.Year, f.Present_Price, f.Kms_Driven,
+         f.Fuel_Type, f.Seller_Type, f.Transmission, f.Owner)
+        for f in batch.items
+    ]
+    prices = await anyio.to_thread.run_sync(_infer, predict_many, rows)
+    return {"prices": prices}
+
 
+if __name__ == "__main__":
+    # local dev equivalent of start.sh; "auto" uses uvloop/httptools where
+    # uvicorn[standard] installed them (not on Windows)
+    import uvicorn
 
-@app.post("/predict",response_model=PredictionResponse)
-def predict(features: Car_Features):
-    price = predict_price(features.model_dump())
-    return PredictionResponse(prediction_price=price)
+    uvicorn.run(
+        "main:app", host="127.0.0.1", port=8000,
+        loop="auto", http="auto", workers=int(os.environ.get("WEB_CONCURRENCY", 1)),
+    )
@@ -1,4 +1,8 @@
+from functools import lru_cache
 from pathlib import Path
+import textwrap
+import threading
+import numpy as np
 import pandas as pd
 import joblib
 
@@ -6,40 +10,165 @@ CAR_PRICE_API_DIR = Path(__file__).resolve().parent
 MODEL_PATH = CAR_PRICE_API_DIR / "random_forest_model.pkl"
 COLS_PATH = CAR_PRICE_API_DIR / "feature_columns.pkl"
 print(COLS_PATH)
-_model = None
-_feature_columns = None
+_scratch = threading.local()
 
+# sklearn trees compare float32 features (sklearn.tree._tree.DTYPE); building
+# rows in that dtype means predict() takes them as-is instead of casting a copy.
+FEATURE_DTYPE = np.float32
 
-def load_artifacts():
-    global _model, _feature_columns
-    if _model is None:
-        _model = joblib.load(MODEL_PATH)
-    if _feature_columns is None:
-        _feature_columns = joblib.load(COLS_PATH)
+
+def _build_vec(row, year_i, present_i, kms_i, year, present_price, kms_driven,
+               fuel_i, seller_i, trans_i, owner_i, name_i):
+    # pure-Python twin of fast.build_vec; -1 marks a category with no column
+    row.fill(0.0)
+    row[year_i] = year
+    row[present_i] = present_price
+    row[kms_i] = kms_driven
+    for i in (fuel_i, seller_i, trans_i, owner_i, name_i):
+        if i >= 0:
+            row[i] = 1.0
+
+
+try:
+    from fast import build_vec  # optional Cython build, see setup.py
+except ImportError:
+    build_vec = _build_vec
+
+
+@lru_cache(maxsize=1)
+def get_artifacts():
+    """
+    Loads (model, feature_columns, column_index) once per process, on first use.
+    column_index maps a training column name to its position in the feature vector.
+    """
+    model = joblib.load(MODEL_PATH)
+    # Inference feeds plain arrays already in feature_columns order,
+    # so drop the fitted names to stop sklearn warning on every call.
+    if hasattr(model, "feature_names_in_"):
+        del model.feature_names_in_
+    feature_columns = joblib.load(COLS_PATH)
+    column_index = {col: i for i, col in enumerate(feature_columns)}
+    return model, feature_columns, column_index
+
+
+def load_artifacts(n_jobs=None):
+    # warm-up hook: pay the load cost before the first request.
+    # n_jobs overrides the forest's own setting (train.py fits with -1);
+    # pool workers pass 1 so each process predicts on a single thread.
+    model, _, _ = get_artifacts()
+    if n_jobs is not None:
+        model.n_jobs = n_jobs
+    get_predict_one()
 
 
 def preprocess(payload: dict) -> pd.DataFrame:
     """
     Converts raw input into the SAME one-hot encoded column structure used in training.
     """
+    _, feature_columns, _ = get_artifacts()
     df = pd.DataFrame([payload])
 
     categorical_cols = ["Fuel_Type", "Seller_Type", "Transmission", "Owner", "Car_Name"]
-    df_encoded = pd.get_dummies(df, columns=categorical_cols, drop_first=True)
+    # No drop_first here: on a single row it would drop the only category.
+    # The alignment below already discards the training-time base levels.
+    df_encoded = pd.get_dummies(df, columns=categorical_cols)
 
     # Align columns to training columns
-    for col in _feature_columns:
+    for col in feature_columns:
         if col not in df_encoded.columns:
             df_encoded[col] = 0
 
     # Remove extra cols (if any) and order correctly
-    df_encoded = df_encoded[_feature_columns]
+    df_encoded = df_encoded[feature_columns]
 
     return df_encoded
 
 
+def _feature_buffer(n_features: int) -> np.ndarray:
+    # one (1, n_features) row per thread, reused across requests
+    buf = getattr(_scratch, "buf", None)
+    if buf is None or buf.shape[1] != n_features:
+        buf = _scratch.buf = np.empty((1, n_features), dtype=FEATURE_DTYPE)
+    return buf
+
+
+def _fill_row(row, idx, car_name, year, present_price, kms_driven,
+              fuel_type, seller_type, transmission, owner):
+    build_vec(
+        row, idx["Year"], idx["Present_Price"], idx["Kms_Driven"],
+        year, present_price, kms_driven,
+        idx.get(f"Fuel_Type_{fuel_type}", -1), idx.get(f"Seller_Type_{seller_type}", -1),
+        idx.get(f"Transmission_{transmission}", -1), idx.get(f"Owner_{owner}", -1),
+        idx.get(f"Car_Name_{car_name}", -1),
+    )
+
+
+def _category_positions(idx: dict, prefix: str, key=str) -> dict:
+    # {"Diesel": 3, "Petrol": 4} for prefix "Fuel_Type_"
+    return {key(col[len(prefix):]): i for col, i in idx.items() if col.startswith(prefix)}
+
+
+@lru_cache(maxsize=1)
+def get_predict_one():
+    """
+    Generates predict_one() for the loaded artifacts, with the column positions
+    and category->position maps baked in as literals, so a request does no
+    f-string building or column-name lookups. Artifacts are fixed for the life
+    of the process (pool children and main._cached_prediction included), so
+    a new model is picked up by restarting the server.
+    """
+    model, feature_columns, idx = get_artifacts()
+    source = textwrap.dedent(f"""
+        _FUEL = {_category_positions(idx, "Fuel_Type_")!r}
+        _SELLER = {_category_positions(idx, "Seller_Type_")!r}
+        _TRANS = {_category_positions(idx, "Transmission_")!r}
+        _OWNER = {_category_positions(idx, "Owner_", int)!r}
+        _NAME = {_category_positions(idx, "Car_Name_")!r}
+
+        def predict_one(car_name, year, present_price, kms_driven,
+                        fuel_type, seller_type, transmission, owner):
+            X = _feature_buffer({len(feature_columns)})
+            build_vec(
+                X[0], {idx["Year"]}, {idx["Present_Price"]}, {idx["Kms_Driven"]},
+                year, present_price, kms_driven,
+                _FUEL.get(fuel_type, -1), _SELLER.get(seller_type, -1),
+                _TRANS.get(transmission, -1), _OWNER.get(owner, -1),
+                _NAME.get(car_name, -1),
+            )
+            return float(_predict(X)[0])
+    """)
+    namespace = {"_feature_buffer": _feature_buffer, "build_vec": build_vec, "_predict": model.predict}
+    exec(compile(source, "<predict_one>", "exec"), namespace)
+    return namespace["predict_one"]
+
+
+def predict_from_fields(car_name: str, year: int, present_price: float, kms_driven: int,
+                        fuel_type: str, seller_type: str, transmission: str, owner: int) -> float:
+    """
+    Same encoding as preprocess(), written straight into a reused float32 row.
+    Categories missing from the training columns (drop_first base, unseen
+    car names) stay all-zero, exactly like the get_dummies alignment.
+    """
+    return get_predict_one()(car_name, year, present_price, kms_driven,
+                             fuel_type, seller_type, transmission, owner)
+
+
+def predict_many(rows: list[tuple]) -> list[float]:
+    """
+    Batched predict_from_fields(): each row is a tuple in the same argument
+    order, and the whole batch goes through a single model.predict() call.
+    """
+    if not rows:
+        return []
+    model, feature_columns, idx = get_artifacts()
+    X = np.empty((len(rows), len(feature_columns)), dtype=FEATURE_DTYPE)
+    for i, fields in enumerate(rows):
+        _fill_row(X[i], idx, *fields)
+    return model.predict(X).tolist()
+
+
 def predict_price(payload: dict) -> float:
-    load_artifacts()
-    X = preprocess(payload)
-    pred = _model.predict(X)[0]
-    return float(pred)
+    return predict_from_fields(
+        payload["Car_Name"], payload["Year"], payload["Present_Price"], payload["Kms_Driven"],
+        payload["Fuel_Type"], payload["Seller_Type"], payload["Transmission"], payload["Owner"],
+    )
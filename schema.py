@@ -1,30 +1,64 @@
 from pydantic import BaseModel, Field
-from enum import Enum
+from typing import Annotated, Literal
+import msgspec
 
-class FuelType(str, Enum):
-    Petrol = "Petrol"
-    Diesel = "Diesel"
-    CNG = "CNG"
+# Literal unions validate through pydantic-core's literal lookup and keep the
+# plain-string JSON surface the old str Enums had.
+FuelType = Literal["Petrol", "Diesel", "CNG"]
+SellerType = Literal["Dealer", "Individual"]
+TransmissionType = Literal["Manual", "Automatic"]
 
-class SellerType(str, Enum):
-    Dealer = "Dealer"
-    Individual = "Individual"
 
-class TransmissionType(str, Enum):
-    Manual = "Manual"
-    Automatic = "Automatic"
+class Car_Features(BaseModel):
+    Car_Name: str = Field(..., max_length=100, examples=["Defender"])
+    Year: int = Field(..., examples=[2020])
+    Present_Price: float = Field(..., examples=[10.5])
+    Kms_Driven: int = Field(..., examples=[27000])
+    Fuel_Type: FuelType
+    Seller_Type: SellerType
+    Transmission: TransmissionType
+    Owner: int = Field(..., ge=0, le=3, examples=[1])
 
+    @classmethod
+    def trusted(cls, data: dict) -> "Car_Features":
+        """
+        Builds the model WITHOUT validation, for internal callers whose data is
+        already clean (batch jobs, tests). HTTP input must go through the normal
+        validated constructor.
+        """
+        return cls.model_construct(**data)
 
-class Car_Features(BaseModel):
-    Car_Name: str = Field(..., example="Defender")
-    Year: int = Field(..., example=2020)
-    Present_Price: float = Field(..., example=10.5)
-    Kms_Driven: int = Field(..., example=27000)
+
+class CarFeaturesMsg(msgspec.Struct):
+    """
+    Same fields and constraints as Car_Features, decoded straight from JSON
+    bytes by msgspec on the /predict hot path. Unlike pydantic's lax mode it
+    does not coerce numeric strings.
+    """
+    Car_Name: Annotated[str, msgspec.Meta(max_length=100)]
+    Year: int
+    Present_Price: float
+    Kms_Driven: int
     Fuel_Type: FuelType
     Seller_Type: SellerType
     Transmission: TransmissionType
-    Owner: int = Field(..., ge=0, le=3, example=1)
+    Owner: Annotated[int, msgspec.Meta(ge=0, le=3)]
+
+
+CAR_DECODER = msgspec.json.Decoder(CarFeaturesMsg)
+
+
+# one pool worker scores the whole batch, so bound its size like /predict's body
+MAX_BATCH_ITEMS = 256
+
+
+class CarBatch(BaseModel):
+    items: list[Car_Features] = Field(..., max_length=MAX_BATCH_ITEMS)
 
 
 class PredictionResponse(BaseModel):
     prediction_price: float
+
+
+class BatchPredictionResponse(BaseModel):
+    prices: list[float]
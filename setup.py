@@ -0,0 +1,10 @@
+# Builds the optional Cython feature-row kernel in place:
+#   python setup.py build_ext --inplace
+# model.py falls back to its pure-Python version when fast.* is not built.
+from setuptools import Extension, setup
+from Cython.Build import cythonize
+
+setup(
+    name="car-price-api-fast",
+    ext_modules=cythonize([Extension("fast", ["fast.pyx"])]),
+)
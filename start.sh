@@ -0,0 +1,9 @@
+#!/usr/bin/env sh
+# Production entrypoint: uvloop event loop + httptools HTTP parser.
+# Each worker already fans inference out to a per-core process pool (see
+# main.py), so one worker is the default; raise WEB_CONCURRENCY to add
+# more event loops in front of it.
+exec uvicorn main:app \
+    --host 0.0.0.0 --port "${PORT:-8000}" \
+    --workers "${WEB_CONCURRENCY:-1}" \
+    --loop uvloop --http httptools
@@ -1,11 +1,28 @@
 import streamlit as st
 import requests
+from requests.adapters import HTTPAdapter
 import json
+import math
+import numpy as np
 import pandas as pd
 import plotly.graph_objects as go
 import plotly.express as px
+from plotly.subplots import make_subplots
 from datetime import datetime
-import time
+
+# orjson is optional: faster encode/decode when installed, stdlib json otherwise
+try:
+    import orjson
+
+    def to_pretty_json(data):
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2).decode()
+
+    parse_json = orjson.loads
+except ImportError:
+    def to_pretty_json(data):
+        return json.dumps(data, indent=2)
+
+    parse_json = json.loads
 
 # Configure page with professional settings
 st.set_page_config(
@@ -16,7 +33,7 @@ st.set_page_config(
 )
 
 # Custom CSS for professional styling
-st.markdown("""
+CSS_BLOCK = """
 <style>
     /* Main container styling */
     .main {
@@ -137,71 +154,174 @@ st.markdown("""
         margin: 1rem 0;
     }
 </style>
-""", unsafe_allow_html=True)
+"""
+st.markdown(CSS_BLOCK, unsafe_allow_html=True)
+
+# Re-read on every rerun, so age-based helpers always see the current year
+CURRENT_YEAR = datetime.now().year
 
 # API endpoint
 API_URL = "https://car-pred-fastapi.onrender.com" or "http://127.0.0.1:8000"
 
+@st.cache_resource(show_spinner=False)
+def get_session():
+    """Keep-alive HTTP session shared across reruns and browser tabs"""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=8)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+def reset_session():
+    """Drop a session whose pooled connection went bad"""
+    get_session().close()
+    get_session.clear()
+
+# Prediction history is stored column-wise with compact dtypes, so analytics
+# reduce over typed arrays instead of rebuilding a DataFrame from dicts
+HISTORY_DTYPES = {
+    'car_name': 'object',
+    'year': 'int16',
+    'predicted_price': 'float32',
+    'present_price': 'float32',
+    'kms_driven': 'int32',
+    'fuel_type': pd.CategoricalDtype(["Petrol", "Diesel", "CNG"]),
+    'transmission': pd.CategoricalDtype(["Manual", "Automatic"]),
+    'timestamp': 'object',
+}
+
+def empty_history():
+    return pd.DataFrame({col: pd.Series(dtype=dtype) for col, dtype in HISTORY_DTYPES.items()})
+
+def append_history(history_df, row):
+    row_df = pd.DataFrame([row], columns=list(HISTORY_DTYPES)).astype(HISTORY_DTYPES)
+    return pd.concat([history_df, row_df], ignore_index=True)
+
+# History only grows by append, so the headline numbers are kept as running
+# aggregates and updated in O(1) per prediction
+def empty_stats():
+    return {'sum': 0.0, 'min': math.inf, 'max': -math.inf, 'n': 0}
+
+def update_stats(stats, price):
+    stats['sum'] += price
+    stats['min'] = min(stats['min'], price)
+    stats['max'] = max(stats['max'], price)
+    stats['n'] += 1
+
 # Initialize session state
-if 'prediction_history' not in st.session_state:
-    st.session_state.prediction_history = []
+if 'prediction_history_df' not in st.session_state:
+    st.session_state.prediction_history_df = empty_history()
+if 'stats' not in st.session_state:
+    st.session_state.stats = empty_stats()
 if 'last_prediction' not in st.session_state:
     st.session_state.last_prediction = None
 
+@st.cache_data(ttl=10, show_spinner=False)
 def check_api_status():
-    """Check if API is accessible"""
+    """Check if API is accessible (cached for 10s so reruns don't re-ping it)"""
     try:
-        response = requests.get(f"{API_URL}/", timeout=3)
+        response = get_session().get(f"{API_URL}/", timeout=3)
         return response.status_code == 200
+    except requests.exceptions.ConnectionError:
+        reset_session()
+        return False
     except:
         return False
 
+def predict_batch(payloads):
+    """Score several vehicles in one round-trip via the /predict_batch endpoint"""
+    response = get_session().post(
+        f"{API_URL}/predict_batch",
+        json={"items": payloads},
+        timeout=15
+    )
+    response.raise_for_status()
+    return parse_json(response.content)["prices"]
+
+@st.cache_data(max_entries=256, show_spinner=False)
+def cached_predict(car_name, year, present_price, kms_driven, fuel_type, seller_type, transmission, owner):
+    """Predicted price for one vehicle; identical re-submissions skip the API round-trip"""
+    payload = {
+        "Car_Name": car_name,
+        "Year": year,
+        "Present_Price": present_price,
+        "Kms_Driven": kms_driven,
+        "Fuel_Type": fuel_type,
+        "Seller_Type": seller_type,
+        "Transmission": transmission,
+        "Owner": owner
+    }
+    return predict_batch([payload])[0]
+
+DEPRECIATION_RATE = 0.15  # 15% per year average
+MIN_RESIDUAL_FRACTION = 0.1  # Minimum 10% of original
+
 def calculate_depreciation(year, present_price):
     """Calculate expected depreciation"""
-    current_year = datetime.now().year
-    age = current_year - year
-    depreciation_rate = 0.15  # 15% per year average
-    expected_value = present_price * ((1 - depreciation_rate) ** age)
-    return max(expected_value, present_price * 0.1)  # Minimum 10% of original
+    age = CURRENT_YEAR - year
+    expected_value = present_price * ((1 - DEPRECIATION_RATE) ** age)
+    return max(expected_value, present_price * MIN_RESIDUAL_FRACTION)
+
+def calculate_depreciation_arr(years, prices):
+    """calculate_depreciation over whole arrays (e.g. the full history) in one call"""
+    years = np.asarray(years, dtype=np.int64)
+    prices = np.asarray(prices, dtype=np.float64)
+    value = prices * (1.0 - DEPRECIATION_RATE) ** (CURRENT_YEAR - years)
+    return np.maximum(value, prices * MIN_RESIDUAL_FRACTION)
+
+# Market insight thresholds and fuel-type notes. Like the rest of the script
+# these are re-evaluated on every rerun (cheap literals).
+NEW_VEHICLE_MAX_AGE = 3
+MODERATE_AGE_MAX_AGE = 7
+LOW_USAGE_KM_PER_YEAR = 10000
+AVERAGE_USAGE_KM_PER_YEAR = 15000
+
+_FUEL_INSIGHTS: dict[str, tuple[str, str, str]] = {
+    "Diesel": ("🔵", "Diesel Engine", "Better fuel efficiency, higher resale in commercial segment"),
+    "Petrol": ("🟢", "Petrol Engine", "Lower maintenance, preferred for city driving"),
+    "CNG": ("🟡", "CNG Variant", "Economical fuel costs, environmental friendly")
+}
 
 def get_market_insights(year, kms_driven, fuel_type):
     """Generate market insights based on inputs"""
     insights = []
-    current_year = datetime.now().year
-    age = current_year - year
+    age = CURRENT_YEAR - year
     
     # Age analysis
-    if age < 3:
+    if age < NEW_VEHICLE_MAX_AGE:
         insights.append(("🟢", "Low Depreciation", "Vehicle is relatively new with minimal depreciation"))
-    elif age < 7:
+    elif age < MODERATE_AGE_MAX_AGE:
         insights.append(("🟡", "Moderate Age", "Good condition expected with reasonable depreciation"))
     else:
         insights.append(("🟠", "Higher Depreciation", "Older vehicle - expect higher depreciation"))
     
     # Mileage analysis
     avg_yearly_km = kms_driven / max(age, 1)
-    if avg_yearly_km < 10000:
+    if avg_yearly_km < LOW_USAGE_KM_PER_YEAR:
         insights.append(("🟢", "Low Usage", "Below average annual mileage - positive for resale"))
-    elif avg_yearly_km < 15000:
+    elif avg_yearly_km < AVERAGE_USAGE_KM_PER_YEAR:
         insights.append(("🟡", "Average Usage", "Normal usage pattern for this age"))
     else:
         insights.append(("🟠", "High Usage", "Above average mileage - may affect valuation"))
     
     # Fuel type insights
-    fuel_insights = {
-        "Diesel": ("🔵", "Diesel Engine", "Better fuel efficiency, higher resale in commercial segment"),
-        "Petrol": ("🟢", "Petrol Engine", "Lower maintenance, preferred for city driving"),
-        "CNG": ("🟡", "CNG Variant", "Economical fuel costs, environmental friendly")
-    }
-    insights.append(fuel_insights.get(fuel_type, fuel_insights["Petrol"]))
+    insights.append(_FUEL_INSIGHTS.get(fuel_type, _FUEL_INSIGHTS["Petrol"]))
     
     return insights
 
-def create_price_gauge(predicted_price, present_price):
-    """Create a gauge chart for price prediction"""
+@st.cache_data(max_entries=128, show_spinner=False)
+def create_valuation_figure(predicted_price, present_price, expected_depreciation):
+    """Price gauge and comparison bars side by side in one figure (cached as figure JSON)"""
     max_price = max(predicted_price, present_price) * 1.5
     
-    fig = go.Figure(go.Indicator(
+    fig = make_subplots(
+        rows=1, cols=2,
+        specs=[[{'type': 'indicator'}, {'type': 'bar'}]],
+        subplot_titles=('', 'Price Comparison Analysis'),
+        horizontal_spacing=0.12
+    )
+    
+    fig.add_trace(go.Indicator(
         mode = "gauge+number+delta",
         value = predicted_price,
         delta = {'reference': present_price, 'valueformat': '.2f'},
@@ -224,20 +344,7 @@ def create_price_gauge(predicted_price, present_price):
                 'value': present_price
             }
         }
-    ))
-    
-    fig.update_layout(
-        height=300,
-        margin=dict(l=20, r=20, t=60, b=20),
-        paper_bgcolor='rgba(0,0,0,0)',
-        font={'family': "Arial, sans-serif"}
-    )
-    
-    return fig
-
-def create_comparison_chart(predicted_price, present_price, expected_depreciation):
-    """Create a comparison bar chart"""
-    fig = go.Figure()
+    ), row=1, col=1)
     
     categories = ['Present Price', 'Predicted Price', 'Expected Value']
     values = [present_price, predicted_price, expected_depreciation]
@@ -253,22 +360,244 @@ def create_comparison_chart(predicted_price, present_price, expected_depreciatio
             line=dict(color='rgba(0,0,0,0.2)', width=2)
         ),
         hovertemplate='<b>%{x}</b><br>₹%{y:.2f} Lakhs<extra></extra>'
-    ))
+    ), row=1, col=2)
     
+    fig.update_yaxes(title_text='Price (₹ Lakhs)', gridcolor='rgba(0,0,0,0.1)', row=1, col=2)
     fig.update_layout(
-        title='Price Comparison Analysis',
-        yaxis_title='Price (₹ Lakhs)',
         height=350,
         margin=dict(l=20, r=20, t=60, b=20),
         paper_bgcolor='rgba(0,0,0,0)',
         plot_bgcolor='rgba(0,0,0,0)',
         font={'family': "Arial, sans-serif", 'size': 12},
+        showlegend=False
+    )
+    
+    return fig.to_json()
+
+def create_price_distribution(prices):
+    """Histogram binned in NumPy so the browser only draws one bar per bin, not every row"""
+    counts, edges = np.histogram(prices, bins='auto')
+    
+    fig = go.Figure(go.Bar(
+        x=(edges[:-1] + edges[1:]) / 2,
+        y=counts,
+        width=np.diff(edges),
+        marker=dict(color='#667eea'),
+        hovertemplate='₹%{x:.2f}L<br>%{y} predictions<extra></extra>'
+    ))
+    
+    fig.update_layout(
+        title='Price Distribution',
+        xaxis_title='Predicted Price (₹ Lakhs)',
+        yaxis_title='count',
+        bargap=0,
         showlegend=False,
-        yaxis=dict(gridcolor='rgba(0,0,0,0.1)')
+        height=300,
+        uirevision='price_distribution'
     )
     
     return fig
 
+def render_analytics_tab():
+    """Analytics tab body, only run while the tab is selected"""
+    st.markdown("### 📈 Market Analytics Dashboard")
+    
+    stats = st.session_state.stats
+    if stats['n']:
+        df = st.session_state.prediction_history_df
+        prices = df['predicted_price'].to_numpy()
+        
+        # Summary statistics, straight from the running aggregates
+        st.markdown("#### Key Statistics")
+        stat_col1, stat_col2, stat_col3, stat_col4 = st.columns(4)
+        
+        with stat_col1:
+            st.metric("Total Predictions", stats['n'])
+        with stat_col2:
+            st.metric("Avg Predicted", f"₹{stats['sum'] / stats['n']:.2f}L")
+        with stat_col3:
+            st.metric("Max Value", f"₹{stats['max']:.2f}L")
+        with stat_col4:
+            st.metric("Min Value", f"₹{stats['min']:.2f}L")
+        
+        st.markdown("---")
+        
+        # Charts
+        chart_col1, chart_col2 = st.columns(2)
+        
+        with chart_col1:
+            # Price distribution
+            fig = create_price_distribution(prices)
+            st.plotly_chart(fig, use_container_width=True)
+        
+        with chart_col2:
+            # Fuel type distribution
+            fuel_counts = df['fuel_type'].value_counts()
+            fuel_counts = fuel_counts[fuel_counts > 0]
+            fig = px.pie(values=fuel_counts.values, names=fuel_counts.index,
+                       title='Fuel Type Distribution',
+                       color_discrete_sequence=px.colors.sequential.RdBu)
+            fig.update_layout(height=300)
+            st.plotly_chart(fig, use_container_width=True)
+        
+        # Data table, only built on request
+        st.markdown("#### Recent Predictions")
+        if st.checkbox("Show table"):
+            display_df = df[['car_name', 'year', 'predicted_price', 'present_price', 'fuel_type', 'timestamp']].copy()
+            display_df.insert(4, 'expected_value', calculate_depreciation_arr(df['year'].to_numpy(), df['present_price'].to_numpy()))
+            display_df.columns = ['Model', 'Year', 'Predicted (₹L)', 'Market (₹L)', 'Expected (₹L)', 'Fuel', 'Timestamp']
+            st.dataframe(display_df.sort_values('Timestamp', ascending=False), use_container_width=True, hide_index=True)
+    
+    else:
+        st.info("📊 No prediction data available yet. Make your first prediction to see analytics.")
+
+def render_history_tab():
+    """History tab body, only run while the tab is selected"""
+    st.markdown("### 📜 Prediction History")
+    
+    history_df = st.session_state.prediction_history_df
+    if len(history_df):
+        # One table + one detail panel instead of an expander per row
+        recent = history_df.tail(10).iloc[::-1]
+        st.dataframe(
+            recent[['car_name', 'year', 'predicted_price', 'present_price', 'kms_driven', 'fuel_type', 'transmission', 'timestamp']],
+            use_container_width=True,
+            hide_index=True
+        )
+        
+        selected = st.selectbox(
+            "Details for",
+            options=recent.index,
+            format_func=lambda i: f"🚗 {recent.at[i, 'car_name']} ({recent.at[i, 'year']}) - {recent.at[i, 'timestamp']}"
+        )
+        pred = recent.loc[selected]
+        with st.expander(f"🚗 {pred['car_name']} ({pred['year']}) - {pred['timestamp']}", expanded=True):
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                st.metric("Predicted Price", f"₹{pred['predicted_price']:.2f}L")
+            with col2:
+                st.metric("Market Price", f"₹{pred['present_price']:.2f}L")
+            with col3:
+                diff = ((pred['predicted_price'] - pred['present_price']) / pred['present_price'] * 100)
+                st.metric("Variance", f"{diff:+.1f}%")
+            
+            st.markdown(f"""
+            **Specifications:**
+            - Kilometers: {pred['kms_driven']:,} km
+            - Fuel Type: {pred['fuel_type']}
+            - Transmission: {pred['transmission']}
+            """)
+    else:
+        st.info("📝 No prediction history available yet.")
+
+def render_valuation_report(report):
+    """Valuation report for the last successful prediction, redrawn on every rerun"""
+    car_name = report['car_name']
+    year = report['year']
+    predicted_price = report['predicted_price']
+    present_price = report['present_price']
+    kms_driven = report['kms_driven']
+    
+    # Display results: the report header and all four metric
+    # cards go out as a single HTML block
+    price_diff = predicted_price - present_price
+    diff_percent = (price_diff / present_price * 100) if present_price > 0 else 0
+    color = "#4caf50" if price_diff > 0 else "#f44336" if price_diff < 0 else "#ff9800"
+    arrow = "↑" if price_diff > 0 else "↓" if price_diff < 0 else "→"
+    expected_depreciation = calculate_depreciation(year, present_price)
+    vehicle_age = CURRENT_YEAR - year
+    
+    results_slot = st.empty()
+    results_slot.markdown(f"""
+    <hr>
+    <h2>📊 Valuation Report</h2>
+    <div style='display: flex; gap: 1rem; margin-bottom: 1.5rem;'>
+        <div class='metric-card' style='flex: 1;'>
+            <h4 style='color: #667eea; margin: 0;'>Predicted Price</h4>
+            <h2 style='margin: 0.5rem 0; color: #333;'>₹{predicted_price:.2f}L</h2>
+        </div>
+        <div class='metric-card' style='flex: 1;'>
+            <h4 style='color: {color}; margin: 0;'>Price Variance</h4>
+            <h2 style='margin: 0.5rem 0; color: {color};'>{arrow} {abs(diff_percent):.1f}%</h2>
+        </div>
+        <div class='metric-card' style='flex: 1;'>
+            <h4 style='color: #ff9800; margin: 0;'>Expected Value</h4>
+            <h2 style='margin: 0.5rem 0; color: #333;'>₹{expected_depreciation:.2f}L</h2>
+        </div>
+        <div class='metric-card' style='flex: 1;'>
+            <h4 style='color: #9c27b0; margin: 0;'>Vehicle Age</h4>
+            <h2 style='margin: 0.5rem 0; color: #333;'>{vehicle_age} years</h2>
+        </div>
+    </div>
+    """, unsafe_allow_html=True)
+    
+    # Visualizations: gauge + comparison in one figure
+    valuation_json = create_valuation_figure(predicted_price, present_price, expected_depreciation)
+    st.plotly_chart(
+        go.Figure(parse_json(valuation_json)),
+        use_container_width=True,
+        key=f"valuation_{predicted_price:.2f}_{present_price:.2f}"
+    )
+    
+    # Detailed analysis
+    st.markdown("### 📋 Detailed Analysis")
+    
+    analysis_col1, analysis_col2 = st.columns(2)
+    
+    with analysis_col1:
+        st.markdown("""
+        <div class='prediction-card'>
+            <h4>💰 Price Assessment</h4>
+        """, unsafe_allow_html=True)
+        
+        if abs(diff_percent) < 5:
+            st.success("✅ Predicted price aligns well with market value")
+        elif diff_percent > 5:
+            st.info(f"📈 Predicted price is {abs(diff_percent):.1f}% higher - indicating strong market demand or unique features")
+        else:
+            st.warning(f"📉 Predicted price is {abs(diff_percent):.1f}% lower - consider factors like mileage, condition, or market trends")
+        
+        st.markdown("</div>", unsafe_allow_html=True)
+    
+    with analysis_col2:
+        st.markdown("""
+        <div class='prediction-card'>
+            <h4>🎯 Recommendation</h4>
+        """, unsafe_allow_html=True)
+        
+        if predicted_price >= present_price * 0.95:
+            st.success("✅ Good value retention - Recommended for purchase/sale")
+        elif predicted_price >= present_price * 0.80:
+            st.info("ℹ️ Fair valuation - Reasonable deal within market range")
+        else:
+            st.warning("⚠️ Below average valuation - Review vehicle condition and market timing")
+        
+        st.markdown("</div>", unsafe_allow_html=True)
+    
+    # Export option
+    st.markdown("---")
+    report_data = {
+        "Vehicle": car_name,
+        "Year": year,
+        "Present_Price": f"₹{present_price:.2f}L",
+        "Predicted_Price": f"₹{predicted_price:.2f}L",
+        "Kilometers": f"{kms_driven:,} km",
+        "Fuel_Type": report['fuel_type'],
+        "Transmission": report['transmission'],
+        "Seller_Type": report['seller_type'],
+        "Owner": report['owner'],
+        "Timestamp": report['timestamp']
+    }
+    
+    stamp = datetime.strptime(report['timestamp'], "%Y-%m-%d %H:%M:%S").strftime('%Y%m%d_%H%M%S')
+    st.download_button(
+        label="📄 Download Valuation Report (JSON)",
+        data=to_pretty_json(report_data),
+        file_name=f"valuation_{car_name.replace(' ', '_')}_{stamp}.json",
+        mime="application/json",
+        use_container_width=True
+    )
+
 def main():
     # Header
     st.markdown("""
@@ -300,23 +629,28 @@ def main():
                 <code>uvicorn main:app --reload</code>
             </div>
             """, unsafe_allow_html=True)
+            
+            if st.button("Reconnect", use_container_width=True):
+                check_api_status.clear()
+                st.rerun()
         
         st.markdown("---")
         
         # Quick stats
         st.markdown("### 📊 Session Statistics")
+        stats = st.session_state.stats
         col1, col2 = st.columns(2)
         with col1:
-            st.metric("Predictions", len(st.session_state.prediction_history))
+            st.metric("Predictions", stats['n'])
         with col2:
-            if st.session_state.prediction_history:
-                avg_price = sum([p['predicted_price'] for p in st.session_state.prediction_history]) / len(st.session_state.prediction_history)
-                st.metric("Avg Price", f"₹{avg_price:.1f}L")
+            if stats['n']:
+                st.metric("Avg Price", f"₹{stats['sum'] / stats['n']:.1f}L")
             else:
                 st.metric("Avg Price", "—")
         
         if st.button("Clear History", use_container_width=True):
-            st.session_state.prediction_history = []
+            st.session_state.prediction_history_df = empty_history()
+            st.session_state.stats = empty_stats()
             st.rerun()
         
         st.markdown("---")
@@ -328,7 +662,11 @@ def main():
         """, unsafe_allow_html=True)
     
     # Main content area with tabs
-    tab1, tab2, tab3 = st.tabs(["🎯 Price Prediction", "📈 Analytics", "📜 History"])
+    tab1, tab2, tab3 = st.tabs(
+        ["🎯 Price Prediction", "📈 Analytics", "📜 History"],
+        key="active_tab",
+        on_change="rerun"
+    )
     
     with tab1:
         # Two-column layout for input form
@@ -349,7 +687,7 @@ def main():
                     year = st.number_input(
                         "Manufacturing Year",
                         min_value=1990,
-                        max_value=datetime.now().year,
+                        max_value=CURRENT_YEAR,
                         value=2020,
                         step=1
                     )
@@ -378,7 +716,7 @@ def main():
                     format="%d km"
                 )
                 
-                st.markdown(f"**Approximate usage:** {kms_driven / max((datetime.now().year - year), 1):,.0f} km/year")
+                st.markdown(f"**Approximate usage:** {kms_driven / max((CURRENT_YEAR - year), 1):,.0f} km/year")
         
         with col_right:
             st.markdown("### ⚙️ Technical Specifications")
@@ -410,16 +748,19 @@ def main():
                 st.markdown("---")
                 st.markdown("### 🔍 Quick Insights")
                 
-                if car_name and year and kms_driven:
-                    insights = get_market_insights(year, kms_driven, fuel_type)
-                    
-                    for icon, title, description in insights:
-                        st.markdown(f"""
+                # Insights don't depend on car_name, so typing a model name
+                # reuses the HTML from the last render instead of rebuilding it
+                if year and kms_driven:
+                    insights_key = (year, kms_driven, fuel_type, CURRENT_YEAR)
+                    if st.session_state.get("_insights_key") != insights_key:
+                        st.session_state._insights_html = "".join(f"""
                         <div style='background: white; padding: 0.75rem; border-radius: 8px; margin: 0.5rem 0; border-left: 3px solid #667eea;'>
                             <strong>{icon} {title}</strong><br>
                             <small style='color: #666;'>{description}</small>
                         </div>
-                        """, unsafe_allow_html=True)
+                        """ for icon, title, description in get_market_insights(year, kms_driven, fuel_type))
+                        st.session_state._insights_key = insights_key
+                    st.markdown(st.session_state._insights_html, unsafe_allow_html=True)
         
         # Predict button (full width)
         st.markdown("<br>", unsafe_allow_html=True)
@@ -431,276 +772,85 @@ def main():
             elif not api_status:
                 st.error("⚠️ API server is not accessible. Please start the backend service.")
             else:
-                # Prepare payload
-                payload = {
-                    "Car_Name": car_name,
-                    "Year": year,
-                    "Present_Price": present_price,
-                    "Kms_Driven": kms_driven,
-                    "Fuel_Type": fuel_type,
-                    "Seller_Type": seller_type,
-                    "Transmission": transmission,
-                    "Owner": owner
-                }
-                
                 # Progress indicator
                 progress_bar = st.progress(0)
                 status_text = st.empty()
                 
                 try:
-                    status_text.text("🔄 Connecting to prediction engine...")
-                    progress_bar.progress(25)
-                    time.sleep(0.3)
-                    
+                    # Progress tracks the real request lifecycle, no artificial delays
                     status_text.text("🤖 Analyzing vehicle parameters...")
-                    progress_bar.progress(50)
+                    progress_bar.progress(25)
                     
-                    # Make API request
-                    response = requests.post(
-                        f"{API_URL}/predict",
-                        json=payload,
-                        headers={"Content-Type": "application/json"},
-                        timeout=15
+                    # Cached per input tuple; a miss is a single-item batch request
+                    predicted_price = cached_predict(
+                        car_name, year, present_price, kms_driven,
+                        fuel_type, seller_type, transmission, owner
                     )
                     
                     progress_bar.progress(75)
                     status_text.text("📊 Generating market insights...")
-                    time.sleep(0.3)
                     
-                    if response.status_code == 200:
-                        result = response.json()
-                        predicted_price = result.get("prediction_price", 0)
-                        
-                        progress_bar.progress(100)
-                        status_text.text("✅ Analysis complete!")
-                        time.sleep(0.5)
-                        progress_bar.empty()
-                        status_text.empty()
-                        
-                        # Store in session
-                        st.session_state.last_prediction = {
-                            'car_name': car_name,
-                            'year': year,
-                            'predicted_price': predicted_price,
-                            'present_price': present_price,
-                            'kms_driven': kms_driven,
-                            'fuel_type': fuel_type,
-                            'transmission': transmission,
-                            'timestamp': datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                        }
-                        st.session_state.prediction_history.append(st.session_state.last_prediction)
-                        
-                        # Display results
-                        st.markdown("---")
-                        st.markdown("## 📊 Valuation Report")
-                        
-                        # Key metrics row
-                        metric_col1, metric_col2, metric_col3, metric_col4 = st.columns(4)
-                        
-                        with metric_col1:
-                            st.markdown("""
-                            <div class='metric-card'>
-                                <h4 style='color: #667eea; margin: 0;'>Predicted Price</h4>
-                                <h2 style='margin: 0.5rem 0; color: #333;'>₹{:.2f}L</h2>
-                            </div>
-                            """.format(predicted_price), unsafe_allow_html=True)
-                        
-                        with metric_col2:
-                            price_diff = predicted_price - present_price
-                            diff_percent = (price_diff / present_price * 100) if present_price > 0 else 0
-                            color = "#4caf50" if price_diff > 0 else "#f44336" if price_diff < 0 else "#ff9800"
-                            arrow = "↑" if price_diff > 0 else "↓" if price_diff < 0 else "→"
-                            
-                            st.markdown(f"""
-                            <div class='metric-card'>
-                                <h4 style='color: {color}; margin: 0;'>Price Variance</h4>
-                                <h2 style='margin: 0.5rem 0; color: {color};'>{arrow} {abs(diff_percent):.1f}%</h2>
-                            </div>
-                            """, unsafe_allow_html=True)
-                        
-                        with metric_col3:
-                            expected_depreciation = calculate_depreciation(year, present_price)
-                            st.markdown(f"""
-                            <div class='metric-card'>
-                                <h4 style='color: #ff9800; margin: 0;'>Expected Value</h4>
-                                <h2 style='margin: 0.5rem 0; color: #333;'>₹{expected_depreciation:.2f}L</h2>
-                            </div>
-                            """, unsafe_allow_html=True)
-                        
-                        with metric_col4:
-                            vehicle_age = datetime.now().year - year
-                            st.markdown(f"""
-                            <div class='metric-card'>
-                                <h4 style='color: #9c27b0; margin: 0;'>Vehicle Age</h4>
-                                <h2 style='margin: 0.5rem 0; color: #333;'>{vehicle_age} years</h2>
-                            </div>
-                            """, unsafe_allow_html=True)
-                        
-                        st.markdown("<br>", unsafe_allow_html=True)
-                        
-                        # Visualizations
-                        viz_col1, viz_col2 = st.columns([1, 1])
-                        
-                        with viz_col1:
-                            gauge_fig = create_price_gauge(predicted_price, present_price)
-                            st.plotly_chart(gauge_fig, use_container_width=True)
-                        
-                        with viz_col2:
-                            comparison_fig = create_comparison_chart(predicted_price, present_price, expected_depreciation)
-                            st.plotly_chart(comparison_fig, use_container_width=True)
-                        
-                        # Detailed analysis
-                        st.markdown("### 📋 Detailed Analysis")
-                        
-                        analysis_col1, analysis_col2 = st.columns(2)
-                        
-                        with analysis_col1:
-                            st.markdown("""
-                            <div class='prediction-card'>
-                                <h4>💰 Price Assessment</h4>
-                            """, unsafe_allow_html=True)
-                            
-                            if abs(diff_percent) < 5:
-                                st.success("✅ Predicted price aligns well with market value")
-                            elif diff_percent > 5:
-                                st.info(f"📈 Predicted price is {abs(diff_percent):.1f}% higher - indicating strong market demand or unique features")
-                            else:
-                                st.warning(f"📉 Predicted price is {abs(diff_percent):.1f}% lower - consider factors like mileage, condition, or market trends")
-                            
-                            st.markdown("</div>", unsafe_allow_html=True)
-                        
-                        with analysis_col2:
-                            st.markdown("""
-                            <div class='prediction-card'>
-                                <h4>🎯 Recommendation</h4>
-                            """, unsafe_allow_html=True)
-                            
-                            if predicted_price >= present_price * 0.95:
-                                st.success("✅ Good value retention - Recommended for purchase/sale")
-                            elif predicted_price >= present_price * 0.80:
-                                st.info("ℹ️ Fair valuation - Reasonable deal within market range")
-                            else:
-                                st.warning("⚠️ Below average valuation - Review vehicle condition and market timing")
-                            
-                            st.markdown("</div>", unsafe_allow_html=True)
-                        
-                        # Export option
-                        st.markdown("---")
-                        report_data = {
-                            "Vehicle": car_name,
-                            "Year": year,
-                            "Present_Price": f"₹{present_price:.2f}L",
-                            "Predicted_Price": f"₹{predicted_price:.2f}L",
-                            "Kilometers": f"{kms_driven:,} km",
-                            "Fuel_Type": fuel_type,
-                            "Transmission": transmission,
-                            "Seller_Type": seller_type,
-                            "Owner": owner,
-                            "Timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                        }
-                        
-                        st.download_button(
-                            label="📄 Download Valuation Report (JSON)",
-                            data=json.dumps(report_data, indent=2),
-                            file_name=f"valuation_{car_name.replace(' ', '_')}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json",
-                            mime="application/json",
-                            use_container_width=True
-                        )
+                    # Store in session
+                    st.session_state.last_prediction = {
+                        'car_name': car_name,
+                        'year': year,
+                        'predicted_price': predicted_price,
+                        'present_price': present_price,
+                        'kms_driven': kms_driven,
+                        'fuel_type': fuel_type,
+                        'transmission': transmission,
+                        'seller_type': seller_type,
+                        'owner': owner,
+                        'timestamp': datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+                    }
+                    st.session_state.prediction_history_df = append_history(
+                        st.session_state.prediction_history_df, st.session_state.last_prediction
+                    )
+                    update_stats(st.session_state.stats, predicted_price)
                     
-                    else:
-                        progress_bar.empty()
-                        status_text.empty()
-                        st.error(f"❌ Prediction failed with status code: {response.status_code}")
-                        try:
-                            error_detail = response.json()
-                            st.json(error_detail)
-                        except:
-                            st.text(response.text)
+                    progress_bar.progress(100)
+                    progress_bar.empty()
+                    status_text.empty()
+                
+                except requests.exceptions.HTTPError as err:
+                    progress_bar.empty()
+                    status_text.empty()
+                    st.error(f"❌ Prediction failed with status code: {err.response.status_code}")
+                    try:
+                        error_detail = parse_json(err.response.content)
+                        st.json(error_detail)
+                    except:
+                        st.text(err.response.text)
                 
                 except requests.exceptions.Timeout:
                     progress_bar.empty()
                     status_text.empty()
                     st.error("⏱️ Request timeout - Please try again")
                 
+                except requests.exceptions.ConnectionError:
+                    reset_session()
+                    progress_bar.empty()
+                    status_text.empty()
+                    st.error("🔌 Connection to the API was lost - Please try again")
+                
                 except Exception as e:
                     progress_bar.empty()
                     status_text.empty()
                     st.error(f"❌ Error: {str(e)}")
+        
+        # Drawn from session state rather than inside the button branch, so
+        # the report survives reruns such as switching tabs and coming back
+        if st.session_state.last_prediction is not None:
+            render_valuation_report(st.session_state.last_prediction)
     
+    # Analytics and History only execute while their tab is selected
     with tab2:
-        st.markdown("### 📈 Market Analytics Dashboard")
-        
-        if st.session_state.prediction_history:
-            df = pd.DataFrame(st.session_state.prediction_history)
-            
-            # Summary statistics
-            st.markdown("#### Key Statistics")
-            stat_col1, stat_col2, stat_col3, stat_col4 = st.columns(4)
-            
-            with stat_col1:
-                st.metric("Total Predictions", len(df))
-            with stat_col2:
-                st.metric("Avg Predicted", f"₹{df['predicted_price'].mean():.2f}L")
-            with stat_col3:
-                st.metric("Max Value", f"₹{df['predicted_price'].max():.2f}L")
-            with stat_col4:
-                st.metric("Min Value", f"₹{df['predicted_price'].min():.2f}L")
-            
-            st.markdown("---")
-            
-            # Charts
-            chart_col1, chart_col2 = st.columns(2)
-            
-            with chart_col1:
-                # Price distribution
-                fig = px.histogram(df, x='predicted_price', 
-                                 title='Price Distribution',
-                                 labels={'predicted_price': 'Predicted Price (₹ Lakhs)'},
-                                 color_discrete_sequence=['#667eea'])
-                fig.update_layout(showlegend=False, height=300)
-                st.plotly_chart(fig, use_container_width=True)
-            
-            with chart_col2:
-                # Fuel type distribution
-                fuel_counts = df['fuel_type'].value_counts()
-                fig = px.pie(values=fuel_counts.values, names=fuel_counts.index,
-                           title='Fuel Type Distribution',
-                           color_discrete_sequence=px.colors.sequential.RdBu)
-                fig.update_layout(height=300)
-                st.plotly_chart(fig, use_container_width=True)
-            
-            # Data table
-            st.markdown("#### Recent Predictions")
-            display_df = df[['car_name', 'year', 'predicted_price', 'present_price', 'fuel_type', 'timestamp']].copy()
-            display_df.columns = ['Model', 'Year', 'Predicted (₹L)', 'Market (₹L)', 'Fuel', 'Timestamp']
-            st.dataframe(display_df.sort_values('Timestamp', ascending=False), use_container_width=True, hide_index=True)
-        
-        else:
-            st.info("📊 No prediction data available yet. Make your first prediction to see analytics.")
+        if tab2.open:
+            render_analytics_tab()
     
     with tab3:
-        st.markdown("### 📜 Prediction History")
-        
-        if st.session_state.prediction_history:
-            for i, pred in enumerate(reversed(st.session_state.prediction_history[-10:])):
-                with st.expander(f"🚗 {pred['car_name']} ({pred['year']}) - {pred['timestamp']}"):
-                    col1, col2, col3 = st.columns(3)
-                    with col1:
-                        st.metric("Predicted Price", f"₹{pred['predicted_price']:.2f}L")
-                    with col2:
-                        st.metric("Market Price", f"₹{pred['present_price']:.2f}L")
-                    with col3:
-                        diff = ((pred['predicted_price'] - pred['present_price']) / pred['present_price'] * 100)
-                        st.metric("Variance", f"{diff:+.1f}%")
-                    
-                    st.markdown(f"""
-                    **Specifications:**
-                    - Kilometers: {pred['kms_driven']:,} km
-                    - Fuel Type: {pred['fuel_type']}
-                    - Transmission: {pred['transmission']}
-                    """)
-        else:
-            st.info("📝 No prediction history available yet.")
+        if tab3.open:
+            render_history_tab()
 
 if __name__ == "__main__":
 
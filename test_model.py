@@ -0,0 +1,78 @@
+import itertools
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import model
+from model import (
+    FEATURE_DTYPE, _build_vec, _fill_row, get_artifacts, predict_from_fields, predict_many, preprocess,
+)
+
+# every categorical level the API accepts, plus a car name the model was
+# trained on and one it has never seen
+GRID = list(itertools.product(
+    ["city", "Unknown Model"],
+    ["Petrol", "Diesel", "CNG"],
+    ["Dealer", "Individual"],
+    ["Manual", "Automatic"],
+    [0, 1, 2, 3],
+))
+
+
+def _rows():
+    return [
+        (car_name, 2015, 10.5, 30000, fuel, seller, transmission, owner)
+        for car_name, fuel, seller, transmission, owner in GRID
+    ]
+
+
+def _payload(row):
+    keys = ["Car_Name", "Year", "Present_Price", "Kms_Driven",
+            "Fuel_Type", "Seller_Type", "Transmission", "Owner"]
+    return dict(zip(keys, row))
+
+
+def test_preprocess_keeps_single_row_categories():
+    # get_dummies(drop_first=True) on one row used to zero every category
+    encoded = preprocess(_payload(("city", 2015, 10.5, 30000, "Diesel", "Individual", "Manual", 1)))
+    row = encoded.iloc[0]
+    for col in ["Car_Name_city", "Fuel_Type_Diesel", "Seller_Type_Individual", "Transmission_Manual", "Owner_1"]:
+        assert row[col] == 1, col
+
+
+def test_fast_path_encodes_like_preprocess():
+    _, feature_columns, idx = get_artifacts()
+    for row in _rows():
+        expected = preprocess(_payload(row)).to_numpy(dtype=FEATURE_DTYPE)[0]
+        fast = np.zeros(len(feature_columns), dtype=FEATURE_DTYPE)
+        _fill_row(fast, idx, *row)
+        np.testing.assert_array_equal(fast, expected, err_msg=str(row))
+
+
+def test_cython_build_vec_matches_python(monkeypatch):
+    fast = pytest.importorskip("fast")
+    _, feature_columns, idx = get_artifacts()
+    # a fractional price as well, so both kernels must round to float32 alike
+    rows = _rows() + [("city", 2011, 7.13, 123457, "Diesel", "Dealer", "Automatic", 1)]
+    for row in rows:
+        filled = []
+        for impl in (_build_vec, fast.build_vec):
+            monkeypatch.setattr(model, "build_vec", impl)
+            out = np.full(len(feature_columns), np.nan, dtype=FEATURE_DTYPE)
+            _fill_row(out, idx, *row)
+            filled.append(out)
+        np.testing.assert_array_equal(filled[1], filled[0], err_msg=str(row))
+
+
+def test_prediction_paths_agree():
+    model, _, _ = get_artifacts()
+    rows = _rows()
+    X = pd.concat([preprocess(_payload(row)) for row in rows], ignore_index=True)
+    expected = model.predict(X.to_numpy(dtype=np.float32))
+
+    single = [predict_from_fields(*row) for row in rows]
+    batch = predict_many(rows)
+
+    np.testing.assert_allclose(single, expected)
+    np.testing.assert_allclose(batch, expected)